@@ -7,126 +7,288 @@ Designed to extract 100+ questions with proper multiple choice options.
 
 import os
 import re
-from pypdf import PdfReader
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pdf_cache import open_pdf_reader
 from pathlib import Path
 import json
+from dataclasses import asdict, dataclass
 from datetime import datetime
 import time
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Question lines (1., 2), Q1., Q.1., Question 1., etc.) and options
+# ((A), (B), C., d), etc.) are matched in a single scan over the whole text.
+# Questions are anchored to the start of a line; an option may start anywhere
+# on a line and runs to its end. Option letters are matched case-insensitively
+# and upper-cased afterwards.
+_QUIZ_TOKEN = re.compile(
+    r'^[^\S\n]*(?:Q\.?[^\S\n]*|Question[^\S\n]+)?(?P<number>\d+)[.)][^\S\n]+(?P<question>\S[^\n]*)'
+    r'|(?i:\((?P<paren_letter>[A-D])\)|(?P<letter>[A-D])[.)])[^\S\n]*(?P<option>\S[^\n]*)',
+    re.MULTILINE
+)
+
+# Answer key entries such as "1. (b)", "2-C" or "3: a", one or more per line.
+# The letter must stand alone so question lines like "4. A bird ..." don't match.
+_ANSWER_KEY = re.compile(
+    r'(?<![\w.])(\d+)[^\S\n]*[-.:)][^\S\n]*\(?([A-Da-d])\)?(?=[^\S\n]*(?:[,;]|\d|$))',
+    re.MULTILINE
+)
+
+# Look for sentences with blanks or underscores
+_BLANK_PATTERNS = [
+    re.compile(r'([^.!?]*?)____+([^.!?]*?)\.?'),
+    re.compile(r'([^.!?]*?)\s+______\s+([^.!?]*?)\.?'),
+    re.compile(r'([^.!?]*?)\s+\.\.\.\.\.\.\s+([^.!?]*?)\.?')
+]
+
+# A question held back at a page break is given up on once this much text
+# (about a page) follows its start without four options turning up
+_MAX_CARRY_CHARS = 4000
+
+# Runs of text between sentence terminators
+_SENTENCE = re.compile(r'[^.!?]+')
+
+# Separators used in the text quiz
+_HR60 = "="*60 + "\n"
+_HR50 = "-"*50 + "\n\n"
+
+def iter_page_texts(pdf_path, start=0):
+    """Yield the text of a PDF one page at a time, from page index ``start``."""
+    reader = open_pdf_reader(pdf_path)
+    num_pages = len(reader.pages)
+    
+    if start == 0:
+        print(f"📖 Reading {num_pages} pages from {os.path.basename(pdf_path)}...")
+    
+    for page_num in range(start, num_pages):
+        yield reader.pages[page_num].extract_text()
+
+def _answer_key(text):
+    """Answers by question number from the answer key entries in ``text``."""
+    return {int(m.group(1)): m.group(2).upper() for m in _ANSWER_KEY.finditer(text)}
+
+def extract_text_from_pdf(pdf_path, max_chars=None):
+    """Extract all text from a PDF file with page information.
+    
+    With ``max_chars``, pages stop being read once that much text is in.
+    """
+    try:
+        page_texts = []
+        total = 0
+        for page_text in iter_page_texts(pdf_path):
+            page_texts.append(page_text)
+            total += len(page_text)
+            if max_chars is not None and total > max_chars:
+                break
+        all_text = "".join(
+            f"\n--- PAGE {i+1} ---\n{page_text}" for i, page_text in enumerate(page_texts)
+        )
+        
+        return all_text, page_texts
+    except Exception as e:
+        print(f"❌ Error reading PDF {pdf_path}: {e}")
+        return None, []
+
+def _extract_one(pdf_path, target):
+    """Extract questions from one PDF in a worker process.
+    
+    Pages are scanned for questions as they are read, and reading stops as
+    soon as ``target`` structured questions have been found.
+    """
+    extractor = AdvancedQuizExtractor()
+    page_texts = []
+    questions = []
+    
+    # The last question on a page is carried over to the next one, since
+    # its options may continue after the page break.
+    carry = ""
+    try:
+        for page_text in iter_page_texts(pdf_path):
+            page_texts.append(page_text)
+            text = f"{carry}\n{page_text}" if carry else page_text
+            found, carry_start = extractor.extract_complete_questions(text)
+            questions.extend(found)
+            carry = text[carry_start:]
+            if len(questions) >= target:
+                break
+    except Exception as e:
+        print(f"❌ Error reading PDF {pdf_path}: {e}")
+        return pdf_path, None, []
+    
+    if carry:
+        questions.extend(extractor.extract_quiz_questions(carry))
+    
+    extractor.apply_pdf_answer_key(questions, pdf_path, page_texts)
+    return pdf_path, "\n".join(page_texts), questions
+
+def _extract_all(pdf_files, target):
+    """Yield ``_extract_one`` results for the PDFs as they finish.
+    
+    Text extraction is CPU-bound pure Python, so with several CPUs the files
+    are spread over worker processes. With one CPU a pool would only add
+    process start-up and pickling, so the files are read in this process.
+    """
+    workers = min(len(pdf_files), os.cpu_count() or 1)
+    if workers == 1:
+        for pdf_file in pdf_files:
+            yield _extract_one(pdf_file, target)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_extract_one, pdf_file, target) for pdf_file in pdf_files]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # The caller stopped early: don't start the remaining files
+            for pending in futures:
+                pending.cancel()
+
+@dataclass
+class Question:
+    """A multiple choice question extracted from a PDF."""
+    __slots__ = ('id', 'text', 'options', 'correct')
+    
+    id: int
+    text: str
+    options: list
+    correct: str
+
 class AdvancedQuizExtractor:
     def __init__(self):
         self.questions = []
         self.total_questions_target = 100
         
-    def extract_text_from_pdf(self, pdf_path):
+    def extract_text_from_pdf(self, pdf_path, max_chars=None):
         """Extract all text from a PDF file with page information."""
-        try:
-            reader = PdfReader(pdf_path)
-            all_text = ""
-            page_texts = []
-            
-            print(f"📖 Reading {len(reader.pages)} pages from {pdf_path.name}...")
-            
-            for i, page in enumerate(reader.pages):
-                page_text = page.extract_text()
-                page_texts.append(page_text)
-                all_text += f"\n--- PAGE {i+1} ---\n" + page_text
-                
-            return all_text, page_texts
-        except Exception as e:
-            print(f"❌ Error reading PDF {pdf_path}: {e}")
-            return None, []
+        return extract_text_from_pdf(pdf_path, max_chars)
 
     def extract_quiz_questions(self, text):
-        """Extract actual quiz questions from PDF text."""
-        questions = []
+        """Extract actual quiz questions from PDF text.
         
-        # Pattern to match numbered questions (1., 2., Q1, Q.1, etc.)
-        question_patterns = [
-            r'(?:^|\n)\s*(\d+)\.?\s*(.+?)(?=\n\s*(?:\d+\.|\(A\)|\(a\)|A\.)|$)',
-            r'(?:^|\n)\s*Q\.?\s*(\d+)\.?\s*(.+?)(?=\n\s*(?:\d+\.|\(A\)|\(a\)|A\.)|$)',
-            r'(?:^|\n)\s*Question\s*(\d+)\.?\s*(.+?)(?=\n\s*(?:\d+\.|\(A\)|\(a\)|A\.)|$)'
-        ]
+        Questions are numbered as printed in the text.
+        """
+        questions, last = self._scan_questions(text)
         
-        # Pattern to match options (A), (B), (C), (D) or A., B., C., D.
-        option_patterns = [
-            r'(?:\(([A-D])\)|([A-D])\.)\s*([^\n]+)',
-            r'(?:\(([a-d])\)|([a-d])\.)\s*([^\n]+)'
-        ]
+        # Add the last question if valid
+        if last is not None and len(last[3]) >= 4:
+            questions.append(self._finish_question(last))
+        
+        return questions
+
+    def extract_complete_questions(self, text):
+        """Extract the questions in ``text`` that can't gain more options.
+        
+        Returns the questions and the offset where the last question
+        starts; its options may continue in text that hasn't been read
+        yet, so the caller should scan from there again with what follows.
+        A last question that already has four options, or that has gone
+        ``_MAX_CARRY_CHARS`` without them, is settled here instead and the
+        offset is the end of the text.
+        """
+        questions, last = self._scan_questions(text)
+        if last is None:
+            return questions, len(text)
+        
+        if len(last[3]) >= 4:
+            questions.append(self._finish_question(last))
+        elif len(text) - last[0] <= _MAX_CARRY_CHARS:
+            return questions, last[0]
+        return questions, len(text)
+
+    def _finish_question(self, last):
+        """Build the Question for a ``(start, id, text, options)`` tuple."""
+        _, question_id, question_text, options = last
+        return Question(
+            id=question_id,
+            text=question_text.strip(),
+            options=options[:4],
+            correct='A'
+        )
+
+    def _scan_questions(self, text):
+        """Scan ``text`` for questions, holding back the last one.
+        
+        Returns the finished questions and ``(start, id, text, options)``
+        for the last question seen, or None if there was none.
+        """
+        questions = []
+        add_question = questions.append
         
-        # Split text into potential question blocks
-        lines = text.split('\n')
         current_question = None
+        current_start = None
         current_options = []
-        question_id = 1
+        add_option = current_options.append
+        question_id = None
         
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line:
-                continue
+        for match in _QUIZ_TOKEN.finditer(text):
+            if match.lastgroup == 'question':
+                # Save previous question if it exists
+                if current_question and len(current_options) >= 4:
+                    add_question(Question(
+                        id=question_id,
+                        text=current_question.strip(),
+                        options=current_options[:4],  # Take first 4 options
+                        correct='A'  # Default, will be updated if answer key found
+                    ))
                 
-            # Check if this line starts a new question
-            for pattern in question_patterns:
-                match = re.search(pattern, line, re.MULTILINE | re.DOTALL)
-                if match:
-                    # Save previous question if it exists
-                    if current_question and len(current_options) >= 4:
-                        questions.append({
-                            'id': question_id,
-                            'text': current_question.strip(),
-                            'options': current_options[:4],  # Take first 4 options
-                            'correct': 'A'  # Default, will be updated if answer key found
-                        })
-                        question_id += 1
-                    
-                    # Start new question
-                    current_question = match.group(2) if len(match.groups()) > 1 else match.group(1)
-                    current_options = []
-                    break
-            
-            # Check if this line is an option
-            for pattern in option_patterns:
-                matches = re.finditer(pattern, line)
-                for match in matches:
-                    option_letter = (match.group(1) or match.group(2) or '').upper()
-                    option_text = match.group(3) if len(match.groups()) > 2 else match.group(-1)
-                    
-                    if option_letter and option_text:
-                        formatted_option = f"{option_letter}. {option_text.strip()}"
-                        current_options.append(formatted_option)
+                # Start new question
+                question_id = int(match.group('number'))
+                current_question = match.group('question')
+                current_start = match.start()
+                current_options = []
+                add_option = current_options.append
+            else:
+                option_letter = (match.group('paren_letter') or match.group('letter')).upper()
+                add_option(f"{option_letter}. {match.group('option').strip()}")
         
-        # Add the last question if valid
-        if current_question and len(current_options) >= 4:
-            questions.append({
-                'id': question_id,
-                'text': current_question.strip(),
-                'options': current_options[:4],
-                'correct': 'A'
-            })
+        if current_question is None:
+            return questions, None
+        return questions, (current_start, question_id, current_question, current_options)
+
+    def apply_answer_key(self, questions, text):
+        """Set correct answers from an answer key found anywhere in the text."""
+        return self._set_answers(questions, _answer_key(text))
+
+    def apply_pdf_answer_key(self, questions, pdf_path, page_texts):
+        """Set correct answers from the answer key of a partly read PDF.
         
+        ``page_texts`` are the pages read so far. Answer keys usually sit at
+        the end of the document, so when those pages hold none the rest of
+        the PDF is scanned for one.
+        """
+        answers = _answer_key("\n".join(page_texts))
+        if not answers and questions:
+            for page_text in iter_page_texts(pdf_path, start=len(page_texts)):
+                answers.update(_answer_key(page_text))
+        return self._set_answers(questions, answers)
+
+    def _set_answers(self, questions, answers):
+        """Set each question's correct letter from ``answers`` by question id."""
+        if answers:
+            for question in questions:
+                question.correct = answers.get(question.id, question.correct)
         return questions
 
     def extract_fill_in_blanks(self, text):
         """Extract fill-in-the-blank questions from text."""
         questions = []
         
-        # Look for sentences with blanks or underscores
-        blank_patterns = [
-            r'([^.!?]*?)____+([^.!?]*?)\.?',
-            r'([^.!?]*?)\s+______\s+([^.!?]*?)\.?',
-            r'([^.!?]*?)\s+\.\.\.\.\.\.\s+([^.!?]*?)\.?'
-        ]
-        
-        sentences = re.split(r'[.!?]+', text)
         question_id = len(self.questions) + 1
         
-        for sentence in sentences:
-            sentence = sentence.strip()
+        # Walk the sentences in place rather than building a list of them
+        for match in _SENTENCE.finditer(text):
+            sentence = match.group().strip()
             if len(sentence) < 20 or len(sentence) > 200:
                 continue
                 
-            for pattern in blank_patterns:
-                match = re.search(pattern, sentence)
+            for pattern in _BLANK_PATTERNS:
+                match = pattern.search(sentence)
                 if match:
                     before_blank = match.group(1).strip()
                     after_blank = match.group(2).strip()
@@ -142,12 +304,12 @@ class AdvancedQuizExtractor:
                         "D. method"
                     ]
                     
-                    questions.append({
-                        'id': question_id,
-                        'text': question_text,
-                        'options': options,
-                        'correct': 'A'
-                    })
+                    questions.append(Question(
+                        id=question_id,
+                        text=question_text,
+                        options=options,
+                        correct='A'
+                    ))
                     question_id += 1
                     break
                     
@@ -155,12 +317,12 @@ class AdvancedQuizExtractor:
 
     def process_all_pdfs(self, sample_files_dir="sample-files"):
         """Process all PDF files and extract questions."""
-        sample_dir = Path(sample_files_dir)
-        if not sample_dir.exists():
+        if not os.path.isdir(sample_files_dir):
             print(f"❌ Directory {sample_files_dir} not found!")
             return []
         
-        pdf_files = list(sample_dir.glob("*.pdf"))
+        with os.scandir(sample_files_dir) as entries:
+            pdf_files = [e.path for e in entries if e.name.lower().endswith('.pdf') and e.is_file()]
         if not pdf_files:
             print(f"❌ No PDF files found in {sample_files_dir}")
             return []
@@ -170,16 +332,12 @@ class AdvancedQuizExtractor:
         
         all_questions = []
         
-        for pdf_file in pdf_files:
-            print(f"\n📖 Processing {pdf_file.name}...")
-            
-            # Extract text
-            full_text, page_texts = self.extract_text_from_pdf(pdf_file)
+        for pdf_file, full_text, quiz_questions in _extract_all(pdf_files, self.total_questions_target):
+            # Actual quiz questions were already extracted page by page
+            print(f"\n📖 Processing {os.path.basename(pdf_file)}...")
             if not full_text:
                 continue
             
-            # Try to extract actual quiz questions first
-            quiz_questions = self.extract_quiz_questions(full_text)
             print(f"   📝 Found {len(quiz_questions)} structured questions")
             
             # If not enough questions, extract fill-in-the-blanks
@@ -196,7 +354,7 @@ class AdvancedQuizExtractor:
         
         # Ensure unique IDs
         for i, question in enumerate(all_questions[:self.total_questions_target]):
-            question['id'] = i + 1
+            question.id = i + 1
         
         self.questions = all_questions[:self.total_questions_target]
         print(f"\n🎉 Final result: {len(self.questions)} questions extracted!")
@@ -205,33 +363,40 @@ class AdvancedQuizExtractor:
 
     def save_questions_to_file(self, filename="extracted_questions.json"):
         """Save questions to JSON file."""
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump({
-                'questions': self.questions,
-                'total': len(self.questions),
-                'extracted_at': datetime.now().isoformat(),
-                'source': 'CHSL PDF Files'
-            }, f, indent=2, ensure_ascii=False)
+        payload = {
+            'questions': self.questions,
+            'total': len(self.questions),
+            'extracted_at': datetime.now().isoformat(),
+            'source': 'CHSL PDF Files'
+        }
+        
+        if ORJSON_AVAILABLE:
+            Path(filename).write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+        else:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, indent=2, ensure_ascii=False, default=asdict)
         
         print(f"💾 Questions saved to {filename}")
 
     def create_text_quiz(self, filename="extracted_quiz.txt"):
         """Create a formatted text file with the quiz."""
+        n = len(self.questions)
+        parts = [
+            _HR60,
+            "PDF QUIZ EXAMINATION\n",
+            f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+            f"Total Questions: {n}\n",
+            _HR60 + "\n"
+        ]
+        
+        for question in self.questions:
+            parts.append(f"Q{question.id}. {question.text}\n\n")
+            parts.extend(f"   {option}\n" for option in question.options)
+            parts.append(f"\nCorrect Answer: {question.correct}\n")
+            parts.append(_HR50)
+        
         with open(filename, 'w', encoding='utf-8') as f:
-            f.write("="*60 + "\n")
-            f.write("PDF QUIZ EXAMINATION\n")
-            f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Total Questions: {len(self.questions)}\n")
-            f.write("="*60 + "\n\n")
-            
-            for question in self.questions:
-                f.write(f"Q{question['id']}. {question['text']}\n\n")
-                
-                for option in question['options']:
-                    f.write(f"   {option}\n")
-                
-                f.write(f"\nCorrect Answer: {question['correct']}\n")
-                f.write("-"*50 + "\n\n")
+            f.writelines(parts)
         
         print(f"📄 Text quiz saved to {filename}")
 
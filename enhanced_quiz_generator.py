@@ -6,14 +6,23 @@ This version analyzes all PDFs and creates a comprehensive quiz.
 
 import os
 import re
-from pypdf import PdfReader
-from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from pdf_cache import open_pdf_reader
 import random
 
+_WS = re.compile(r'\s+')
+_STRIP = re.compile(r'[^\w\s.,!?;:]+')
+_SENTENCE = re.compile(r'[^.!?]+')
+_ALPHA3 = re.compile(r'(?<!\S)[^\W\d_]{3,}(?!\S)')
+_WORD = re.compile(r'\S+')
+
+# Common words that make poor blanks
+_STOPWORDS = frozenset(('that', 'this', 'with', 'from', 'they', 'have', 'been', 'were', 'will'))
+
 def extract_text_from_pdf(pdf_path):
     """Extract all text from a PDF file."""
     try:
-        reader = PdfReader(pdf_path)
+        reader = open_pdf_reader(pdf_path)
         text = ""
         
         for page_num, page in enumerate(reader.pages):
@@ -30,76 +39,56 @@ def extract_sentences(text):
     if not text:
         return []
     
-    # Clean up text first
-    text = re.sub(r'\s+', ' ', text)  # Replace multiple spaces with single space
-    text = re.sub(r'[^\w\s.,!?;:]', '', text)  # Keep basic punctuation
+    # Clean up text first: collapse whitespace, keep basic punctuation
+    text = _STRIP.sub('', _WS.sub(' ', text))
     
-    # Split into sentences
-    sentences = re.split(r'[.!?]+', text)
-    
-    # Clean up sentences
-    cleaned_sentences = []
-    for sentence in sentences:
-        sentence = sentence.strip()
-        
-        # Keep sentences that are reasonable length and contain words
-        if 15 < len(sentence) < 150 and sentence.count(' ') > 2:
-            # Avoid sentences that are mostly numbers or single words
-            words = sentence.split()
-            if len([w for w in words if w.isalpha() and len(w) > 2]) >= 3:
-                cleaned_sentences.append(sentence)
-    
-    return cleaned_sentences
+    # Keep sentences that are reasonable length and contain words,
+    # avoiding sentences that are mostly numbers or single words
+    return [
+        sentence for sentence in (m.group().strip() for m in _SENTENCE.finditer(text))
+        if 15 < len(sentence) < 150 and sentence.count(' ') > 2 and len(_ALPHA3.findall(sentence)) >= 3
+    ]
 
 def create_fill_in_blank_questions(sentences, num_questions=8):
     """Create fill-in-the-blank questions from sentences."""
     questions = []
-    used_sentences = set()
     
-    # Shuffle sentences for variety
-    shuffled_sentences = sentences.copy()
-    random.shuffle(shuffled_sentences)
+    # Sample sentences for variety; only a few candidates per question are needed.
+    # The sample never repeats a position, so no separate dedup set is required.
+    shuffled_sentences = random.sample(sentences, min(len(sentences), num_questions * 4))
+    choice = random.choice
     
     for sentence in shuffled_sentences:
         if len(questions) >= num_questions:
             break
             
-        if sentence in used_sentences:
-            continue
-            
-        words = sentence.split()
+        # Word positions in the sentence as (start, end, word)
+        spans = [(m.start(), m.end(), m.group()) for m in _WORD.finditer(sentence)]
         
-        if len(words) < 4:
+        if len(spans) < 4:
             continue
             
         # Choose a meaningful word to blank out
-        potential_words = []
-        for i, word in enumerate(words):
-            # Skip common words and very short words
-            if (len(word) > 3 and 
-                word.lower() not in ['that', 'this', 'with', 'from', 'they', 'have', 'been', 'were', 'will'] and
-                word.isalpha() and
-                not word.isupper()):  # Skip all caps words
-                potential_words.append((i, word))
+        # Skip very short words, non-words, all caps words and common words
+        potential_words = [
+            (start, end, word) for start, end, word in spans
+            if len(word) > 3 and word.isalpha() and not word.isupper() and word.lower() not in _STOPWORDS
+        ]
         
         if not potential_words:
             continue
             
         # Choose a random word from potential words
-        word_index, word_to_blank = random.choice(potential_words)
+        start, end, word_to_blank = choice(potential_words)
         
-        # Create the question
-        question_words = words.copy()
-        question_words[word_index] = "______"
-        question_text = " ".join(question_words)
+        # Create the question by splicing the blank into the original sentence
+        question_text = sentence[:start] + "______" + sentence[end:]
         
         questions.append({
             'question': question_text,
             'answer': word_to_blank,
             'original': sentence
         })
-        
-        used_sentences.add(sentence)
     
     return questions
 
@@ -109,12 +98,13 @@ def analyze_all_pdfs():
     print("🔍 Analyzing Multiple PDF Files")
     print("=" * 60)
     
-    sample_files_dir = Path("sample-files")
-    if not sample_files_dir.exists():
+    sample_files_dir = "sample-files"
+    if not os.path.isdir(sample_files_dir):
         print("❌ Sample-files directory not found!")
         return
     
-    pdf_files = list(sample_files_dir.glob("*.pdf"))
+    with os.scandir(sample_files_dir) as entries:
+        pdf_files = [e for e in entries if e.name.lower().endswith('.pdf') and e.is_file()]
     if not pdf_files:
         print("❌ No PDF files found in sample-files directory!")
         return
@@ -124,23 +114,26 @@ def analyze_all_pdfs():
     all_sentences = []
     pdf_analysis = []
     
-    for pdf_file in pdf_files:
-        print(f"\n📖 Analyzing {pdf_file.name}...")
+    # Each PDF is parsed in its own worker process; results come back in order.
+    with ProcessPoolExecutor(max_workers=min(len(pdf_files), os.cpu_count() or 1)) as executor:
+        texts = executor.map(extract_text_from_pdf, [e.path for e in pdf_files])
         
-        text = extract_text_from_pdf(pdf_file)
-        if text:
-            sentences = extract_sentences(text)
-            pdf_info = {
-                'filename': pdf_file.name,
-                'text_length': len(text),
-                'sentences': len(sentences),
-                'file_size': pdf_file.stat().st_size
-            }
-            pdf_analysis.append(pdf_info)
-            all_sentences.extend(sentences)
-            print(f"  ✅ Extracted {len(text):,} characters, {len(sentences)} sentences")
-        else:
-            print(f"  ❌ Failed to extract text")
+        for pdf_file, text in zip(pdf_files, texts):
+            print(f"\n📖 Analyzing {pdf_file.name}...")
+            
+            if text:
+                sentences = extract_sentences(text)
+                pdf_info = {
+                    'filename': pdf_file.name,
+                    'text_length': len(text),
+                    'sentences': len(sentences),
+                    'file_size': pdf_file.stat().st_size
+                }
+                pdf_analysis.append(pdf_info)
+                all_sentences.extend(sentences)
+                print(f"  ✅ Extracted {len(text):,} characters, {len(sentences)} sentences")
+            else:
+                print(f"  ❌ Failed to extract text")
     
     if not all_sentences:
         print("❌ No content could be extracted from any PDF")
@@ -5,8 +5,11 @@ Serves the quiz questions generated from PDF files via a web API.
 Enhanced with multi-format file support (PDF, TXT, DOCX, DOC)
 """
 
-from flask import Flask, render_template, jsonify, request, send_from_directory
+from flask import Flask, Response, render_template, jsonify, request, send_from_directory
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+from werkzeug.exceptions import NotFound
+import hashlib
 import json
 import os
 import re
@@ -15,7 +18,11 @@ from pathlib import Path
 import random
 import threading
 import time
+from collections import OrderedDict
+from dataclasses import asdict
+from functools import lru_cache
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from advanced_quiz_extractor import AdvancedQuizExtractor
 
 # Additional imports for multi-format support
@@ -34,7 +41,62 @@ except ImportError:
     DOC_AVAILABLE = False
     print("⚠️ pywin32 not available. DOC support disabled.")
 
+try:
+    from waitress import serve
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+    print("⚠️ waitress not available. Falling back to the Flask development server.")
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    print("⚠️ orjson not available. Using standard json for API responses.")
+
+# Patterns used when picking quiz sentences out of PDF text
+_WS_RE = re.compile(r'\s+')
+_PUNCT_RE = re.compile(r'[^\w\s.,!?;:-]')
+_SENT_SPLIT_RE = re.compile(r'[.!?]+')
+# Sentence prefilter: 21-119 chars, at least four spaces, no question/page
+# prefix, no four-digit number and no exam references
+_QUALIFY_RE = re.compile(r'(?!Q |Page )(?!.*\d{4})(?!.*CHSL)(?=(?:[^ ]* ){4}).{21,119}$')
+
+# Common words that make poor blanks
+_STOPWORDS = frozenset({
+    'that', 'this', 'with', 'from', 'they', 'have', 'been', 'were', 'will',
+    'when', 'where', 'which', 'their', 'there', 'these', 'those'
+})
+
+# Generic distractors for multiple choice options
+_WRONG_OPTIONS = (
+    'system', 'process', 'method', 'approach', 'factor', 'element', 'aspect',
+    'concept', 'principle', 'structure', 'important', 'significant', 'essential',
+    'necessary', 'required', 'appropriate', 'suitable', 'correct', 'proper', 'effective'
+)
+
+# File types offered as sample files
+_ALLOWED_EXTS = frozenset({'pdf', 'txt', 'docx', 'doc'})
+
+# Stop extracting a PDF once this much text has been collected
+_MAX_TEXT_CHARS = 200_000
+
+# Sample files larger than this are listed in previews but not parsed
+_MAX_PREVIEW_SIZE = 10 * 1024 * 1024
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider that encodes and decodes with orjson."""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+if ORJSON_AVAILABLE:
+    app.json = OrjsonProvider(app)
 CORS(app)
 
 # Global variables for progress tracking
@@ -45,29 +107,176 @@ extraction_progress = {
     'questions_found': 0,
     'current_file': ''
 }
+# A job that has published one of these has nothing left to report
+_FINISHED_STATUSES = ('completed', 'error')
+
+# Progress streams end after this long, or as soon as nothing is running, so
+# an open tab can't hold a server worker thread; EventSource reconnects
+_STREAM_MAX_SECONDS = 60
+
+# Notified whenever extraction_progress changes so streams can push updates
+_progress_changed = threading.Condition()
+
+def _update_progress(values, reset=False):
+    """Update the shared progress dict and wake any streaming clients."""
+    with _progress_changed:
+        if reset:
+            extraction_progress.clear()
+        extraction_progress.update(values)
+        _progress_changed.notify_all()
+
+# Extraction jobs run one at a time on a single background worker
+_extraction_pool = ThreadPoolExecutor(max_workers=1)
+_current_job = None
+_job_lock = threading.Lock()
+
+def _start_extraction_job(job, initial_progress):
+    """Reset progress and queue ``job``; return False if one is still running.
+    
+    A job counts as finished once it has published its final status, even
+    if its future is still winding down; clients react to that status right
+    away. The single worker still runs the new job strictly after it.
+    """
+    global _current_job
+    with _job_lock:
+        if (_current_job is not None and not _current_job.done()
+                and extraction_progress['status'] not in _FINISHED_STATUSES):
+            return False
+        _update_progress(initial_progress, reset=True)
+        _current_job = _extraction_pool.submit(job)
+        return True
+
+def _fmt_size(size):
+    """Human readable file size (B, KB or MB)."""
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MB"
+    if size >= 1024:
+        return f"{size / 1024:.1f} KB"
+    return str(size) + " B"
+
+def _etag(payload):
+    """Strong ETag for a response body."""
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+def _file_key(path):
+    """Cache key for a file: its path, modification time and size."""
+    stat = os.stat(path)
+    return str(path), stat.st_mtime_ns, stat.st_size
+
+@lru_cache(maxsize=64)
+def _cached_pdf_text(path_str, mtime_ns, size):
+    """Extract all text from a PDF file, cached until the file changes."""
+    reader = PdfReader(path_str)
+    parts = []
+    total = 0
+    
+    for page in reader.pages:
+        page_text = page.extract_text()
+        if page_text:
+            parts.append(page_text)
+            total += len(page_text)
+            # Plenty of text for a quiz; skip parsing the remaining pages
+            if total > _MAX_TEXT_CHARS:
+                break
+        
+    return " ".join(parts)
+
+def _process_one_pdf(path_str):
+    """Extract quiz questions from one PDF in a worker process."""
+    extractor = AdvancedQuizExtractor()
+    full_text, page_texts = extractor.extract_text_from_pdf(path_str, max_chars=_MAX_TEXT_CHARS)
+    if not full_text:
+        return []
+    
+    # Extract quiz questions
+    quiz_questions = extractor.extract_quiz_questions(full_text)
+    extractor.apply_pdf_answer_key(quiz_questions, path_str, page_texts)
+    
+    # If not enough structured questions, generate fill-in-the-blanks
+    if len(quiz_questions) < 10:
+        blank_questions = extractor.extract_fill_in_blanks(full_text)
+        quiz_questions.extend(blank_questions[:25])  # Add up to 25 per file
+    
+    # The web API works with plain question dicts
+    return [asdict(question) for question in quiz_questions]
+
+# Questions extracted per PDF path as (_file_key, questions), reused across
+# regenerations. A changed file replaces its entry, and only the most
+# recently used paths are kept.
+_pdf_questions_cache = OrderedDict()
+_MAX_CACHED_PDFS = 64
+
+def _cached_pdf_questions(key):
+    """Questions cached for the file revision ``key``, or None."""
+    entry = _pdf_questions_cache.get(key[0])
+    if entry is None or entry[0] != key:
+        return None
+    _pdf_questions_cache.move_to_end(key[0])
+    return entry[1]
+
+def _store_pdf_questions(key, questions):
+    """Cache ``questions`` for the file revision ``key``, evicting the oldest."""
+    _pdf_questions_cache[key[0]] = (key, questions)
+    _pdf_questions_cache.move_to_end(key[0])
+    while len(_pdf_questions_cache) > _MAX_CACHED_PDFS:
+        _pdf_questions_cache.popitem(last=False)
+
+@lru_cache(maxsize=64)
+def _cached_meaningful_sentences(text):
+    """Sentences of ``text`` suitable for quiz questions, cached per text."""
+    # Clean up text
+    text = _WS_RE.sub(' ', text)
+    text = _PUNCT_RE.sub('', text)
+    
+    # Split into sentences
+    sentences = _SENT_SPLIT_RE.split(text)
+    
+    cleaned_sentences = []
+    for sentence in sentences:
+        sentence = sentence.strip()
+        
+        # Filter for educational content: skip question/page numbers,
+        # years and exam references before counting real words
+        if not _QUALIFY_RE.match(sentence):
+            continue
+        if sum(1 for w in sentence.split() if len(w) > 2 and w.isalpha()) >= 4:
+            cleaned_sentences.append(sentence)
+    
+    return tuple(cleaned_sentences)
 
 class WebQuizGenerator:
     def __init__(self):
         self.questions = []
         self.extractor = AdvancedQuizExtractor()
+    
+    @property
+    def questions(self):
+        return self._questions
+    
+    @questions.setter
+    def questions(self, questions):
+        # Any new question set invalidates the serialized /api/questions body,
+        # kept as (questions, body, etag) so the three always belong together
+        self._questions = questions
+        self._questions_response = None
+        # Answer key for scoring: question id -> position, and letter codes
+        self._id_index = {str(q['id']): i for i, q in enumerate(questions)}
+        self._correct_codes = [ord(q['correct']) for q in questions]
         
     def load_questions_from_pdfs_with_progress(self):
         """Load questions from PDFs with progress tracking."""
-        global extraction_progress
-        
         try:
-            extraction_progress.update({
+            _update_progress({
                 'status': 'starting',
                 'progress': 5,
                 'message': 'Initializing PDF processor...',
                 'questions_found': 0,
                 'current_file': ''
             })
-            time.sleep(1)
             
             sample_files_dir = Path("sample-files")
             if not sample_files_dir.exists():
-                extraction_progress.update({
+                _update_progress({
                     'status': 'error',
                     'message': 'Sample-files directory not found!',
                     'progress': 0
@@ -76,66 +285,77 @@ class WebQuizGenerator:
             
             pdf_files = list(sample_files_dir.glob("*.pdf"))
             if not pdf_files:
-                extraction_progress.update({
+                _update_progress({
                     'status': 'error',
                     'message': 'No PDF files found!',
                     'progress': 0
                 })
                 return
             
-            extraction_progress.update({
+            _update_progress({
                 'status': 'processing',
                 'progress': 10,
                 'message': f'Found {len(pdf_files)} PDF files. Starting extraction...',
                 'current_file': ''
             })
-            time.sleep(1)
             
             all_questions = []
             total_files = len(pdf_files)
+            done_files = 0
             
-            for i, pdf_file in enumerate(pdf_files):
-                file_progress = 10 + (i * 70 // total_files)
-                extraction_progress.update({
+            def record(pdf_file, quiz_questions):
+                nonlocal done_files
+                done_files += 1
+                # Copy so renumbering below never touches the cached dicts
+                all_questions.extend(dict(question) for question in quiz_questions)
+                _update_progress({
                     'status': 'processing',
-                    'progress': file_progress,
-                    'message': f'Processing {pdf_file.name}...',
+                    'progress': 10 + (done_files * 70 // total_files),
+                    'message': f'Processed {pdf_file.name}',
                     'current_file': pdf_file.name,
                     'questions_found': len(all_questions)
                 })
-                
-                # Extract text from PDF
-                full_text, page_texts = self.extractor.extract_text_from_pdf(pdf_file)
-                if not full_text:
-                    continue
-                
-                # Extract quiz questions
-                quiz_questions = self.extractor.extract_quiz_questions(full_text)
-                
-                # If not enough structured questions, generate fill-in-the-blanks
-                if len(quiz_questions) < 10:
-                    blank_questions = self.extractor.extract_fill_in_blanks(full_text)
-                    quiz_questions.extend(blank_questions[:25])  # Add up to 25 per file
-                
-                all_questions.extend(quiz_questions)
-                
-                extraction_progress.update({
-                    'questions_found': len(all_questions)
-                })
-                
-                # If we have enough questions, break
-                if len(all_questions) >= 100:
-                    break
-                
-                time.sleep(0.5)  # Small delay for visual progress
             
-            extraction_progress.update({
+            # Unchanged PDFs reuse their questions; the rest are parsed in
+            # parallel worker processes since extraction is CPU-bound.
+            pending = {}
+            for pdf_file in pdf_files:
+                key = _file_key(pdf_file)
+                cached = _cached_pdf_questions(key)
+                if cached is not None:
+                    record(pdf_file, cached)
+                else:
+                    pending[key] = pdf_file
+            
+            if pending and len(all_questions) < 100:
+                with ProcessPoolExecutor(max_workers=min(len(pending), os.cpu_count() or 1)) as executor:
+                    futures = {
+                        executor.submit(_process_one_pdf, key[0]): key
+                        for key in pending
+                    }
+                    
+                    for future in as_completed(futures):
+                        key = futures[future]
+                        try:
+                            quiz_questions = future.result()
+                        except Exception as e:
+                            print(f"❌ Error processing {pending[key].name}: {e}")
+                            quiz_questions = []
+                        _store_pdf_questions(key, quiz_questions)
+                        record(pending[key], quiz_questions)
+                        
+                        # If we have enough questions, stop
+                        if len(all_questions) >= 100:
+                            for other in futures:
+                                other.cancel()
+                            break
+            
+            _update_progress({
                 'status': 'finalizing',
                 'progress': 85,
                 'message': 'Finalizing questions and formatting...',
                 'questions_found': len(all_questions)
             })
-            time.sleep(1)
             
             # Ensure unique IDs and limit to 100 questions
             final_questions = all_questions[:100]
@@ -144,7 +364,7 @@ class WebQuizGenerator:
             
             self.questions = final_questions
             
-            extraction_progress.update({
+            _update_progress({
                 'status': 'completed',
                 'progress': 100,
                 'message': f'Successfully extracted {len(self.questions)} questions!',
@@ -154,7 +374,7 @@ class WebQuizGenerator:
             print(f"✅ Extraction completed: {len(self.questions)} questions ready")
             
         except Exception as e:
-            extraction_progress.update({
+            _update_progress({
                 'status': 'error',
                 'progress': 0,
                 'message': f'Error during extraction: {str(e)}',
@@ -167,14 +387,7 @@ class WebQuizGenerator:
     def extract_text_from_pdf(self, pdf_path):
         """Extract all text from a PDF file."""
         try:
-            reader = PdfReader(pdf_path)
-            text = ""
-            
-            for page in reader.pages:
-                page_text = page.extract_text()
-                text += page_text + " "
-                
-            return text
+            return _cached_pdf_text(*_file_key(pdf_path))
         except Exception as e:
             print(f"Error reading PDF {pdf_path}: {e}")
             return None
@@ -184,43 +397,19 @@ class WebQuizGenerator:
         if not text:
             return []
         
-        # Clean up text
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'[^\w\s.,!?;:-]', '', text)
-        
-        # Split into sentences
-        sentences = re.split(r'[.!?]+', text)
-        
-        cleaned_sentences = []
-        for sentence in sentences:
-            sentence = sentence.strip()
-            
-            # Filter for educational content
-            if (20 < len(sentence) < 120 and 
-                sentence.count(' ') > 3 and
-                not re.search(r'\d{4}', sentence) and  # Avoid years/numbers
-                not sentence.startswith('Q ') and      # Avoid question numbers
-                not sentence.startswith('Page ') and   # Avoid page numbers
-                'CHSL' not in sentence and             # Avoid exam references
-                len([w for w in sentence.split() if w.isalpha() and len(w) > 2]) >= 4):
-                cleaned_sentences.append(sentence)
-        
-        return cleaned_sentences
+        return list(_cached_meaningful_sentences(text))
 
     def create_quiz_questions(self, sentences, num_questions=15):
         """Create quiz questions from sentences."""
         questions = []
-        used_sentences = set()
         
-        random.shuffle(sentences)
+        # Only draw as many candidates as we could plausibly need
+        candidates = random.sample(sentences, min(len(sentences), num_questions * 3))
         
-        for sentence in sentences:
+        for sentence in candidates:
             if len(questions) >= num_questions:
                 break
                 
-            if sentence in used_sentences:
-                continue
-                
             words = sentence.split()
             
             # Find good words to blank out
@@ -228,7 +417,7 @@ class WebQuizGenerator:
             for i, word in enumerate(words):
                 if (len(word) > 4 and 
                     word.isalpha() and
-                    word.lower() not in ['that', 'this', 'with', 'from', 'they', 'have', 'been', 'were', 'will', 'when', 'where', 'which', 'their', 'there', 'these', 'those'] and
+                    word.lower() not in _STOPWORDS and
                     not word.isupper()):
                     important_words.append((i, word))
             
@@ -244,26 +433,24 @@ class WebQuizGenerator:
             question_text = " ".join(question_words)
             
             # Generate multiple choice options
-            options = [word_to_blank]
+            wrongs = []
+            options_lower = {word_to_blank.lower()}
             
             # Add some generic wrong options
-            wrong_options = ['system', 'process', 'method', 'approach', 'factor', 'element', 'aspect', 'concept', 'principle', 'structure', 'important', 'significant', 'essential', 'necessary', 'required', 'appropriate', 'suitable', 'correct', 'proper', 'effective']
-            
-            for wrong in wrong_options:
-                if (wrong != word_to_blank.lower() and 
-                    len(options) < 4 and 
-                    wrong not in [opt.lower() for opt in options]):
+            for wrong in _WRONG_OPTIONS:
+                if len(wrongs) < 3 and wrong not in options_lower:
                     formatted_wrong = wrong.capitalize() if word_to_blank[0].isupper() else wrong
-                    options.append(formatted_wrong)
+                    wrongs.append(formatted_wrong)
+                    options_lower.add(wrong)
             
-            # Ensure we have exactly 4 options
-            while len(options) < 4:
-                options.append(f"Option{len(options)}")
+            # Ensure we have exactly 3 wrong options
+            while len(wrongs) < 3:
+                wrongs.append(f"Option{len(wrongs) + 1}")
             
-            # Shuffle options and determine correct answer
+            # Drop the correct answer into a random slot
             correct_answer_text = word_to_blank
-            random.shuffle(options)
-            correct_index = options.index(correct_answer_text)
+            correct_index = random.randrange(4)
+            options = wrongs[:correct_index] + [correct_answer_text] + wrongs[correct_index:]
             correct_letter = chr(65 + correct_index)  # A, B, C, D
             
             # Format options as A. option, B. option, etc.
@@ -277,8 +464,6 @@ class WebQuizGenerator:
                 'correct_text': correct_answer_text,
                 'original': sentence
             })
-            
-            used_sentences.add(sentence)
         
         return questions
 
@@ -297,12 +482,16 @@ class WebQuizGenerator:
         print(f"Processing {len(pdf_files)} PDF files...")
         
         all_sentences = []
+        seen = set()  # Sample PDFs often repeat the same boilerplate sentences
         for pdf_file in pdf_files:
             print(f"Reading {pdf_file.name}...")
             text = self.extract_text_from_pdf(pdf_file)
             if text:
                 sentences = self.extract_meaningful_sentences(text)
-                all_sentences.extend(sentences)
+                for sentence in sentences:
+                    if sentence not in seen:
+                        seen.add(sentence)
+                        all_sentences.append(sentence)
                 print(f"Added {len(sentences)} sentences from {pdf_file.name}")
         
         if all_sentences:
@@ -315,78 +504,90 @@ class WebQuizGenerator:
 
     def get_fallback_questions(self):
         """Fallback questions if PDF processing fails."""
-        return [
-            {
-                "id": 1,
-                "text": "But just then, both of them were ______ by the soldiers",
-                "options": ["A. system", "B. process", "C. method", "D. captured"],
-                "correct": "D",
-                "correct_text": "captured"
-            },
-            {
-                "id": 2,
-                "text": "______ is not innocent such as Uday",
-                "options": ["A. Method", "B. System", "C. Process", "D. Harmit"],
-                "correct": "D",
-                "correct_text": "Harmit"
-            },
-            {
-                "id": 3,
-                "text": "The following ______ has been divided into four segments",
-                "options": ["A. process", "B. sentence", "C. method", "D. system"],
-                "correct": "B",
-                "correct_text": "sentence"
-            },
-            {
-                "id": 4,
-                "text": "If there is no need to substitute it, select No substitution ______",
-                "options": ["A. method", "B. required", "C. process", "D. system"],
-                "correct": "B",
-                "correct_text": "required"
-            },
-            {
-                "id": 5,
-                "text": "But, when the ______ was thrown in front of the lion, the lion licked him and quietly sat beside him",
-                "options": ["A. system", "B. slave", "C. method", "D. process"],
-                "correct": "B",
-                "correct_text": "slave"
-            },
-            {
-                "id": 6,
-                "text": "______ out a tower of pots",
-                "options": ["A. knock", "B. process", "C. method", "D. system"],
-                "correct": "A",
-                "correct_text": "knock"
-            },
-            {
-                "id": 7,
-                "text": "The following sentence has been divided into four ______",
-                "options": ["A. method", "B. system", "C. process", "D. segments"],
-                "correct": "D",
-                "correct_text": "segments"
-            },
-            {
-                "id": 8,
-                "text": "How is the structure of health infrastructure and health care system in ______",
-                "options": ["A. Process", "B. Method", "C. System", "D. India"],
-                "correct": "D",
-                "correct_text": "India"
-            },
-            {
-                "id": 9,
-                "text": "Parts of the following sentence have been underlined and given as ______",
-                "options": ["A. options", "B. process", "C. system", "D. method"],
-                "correct": "A",
-                "correct_text": "options"
-            },
-            {
-                "id": 10,
-                "text": "Read the passage carefully and select the most ______ option to fill in each blank",
-                "options": ["A. appropriate", "B. process", "C. system", "D. method"],
-                "correct": "A",
-                "correct_text": "appropriate"
-            }
-        ]
+        return _FALLBACK_QUESTIONS
+
+# Fallback questions if PDF processing fails
+_FALLBACK_QUESTIONS = [
+    {
+        "id": 1,
+        "text": "But just then, both of them were ______ by the soldiers",
+        "options": ["A. system", "B. process", "C. method", "D. captured"],
+        "correct": "D",
+        "correct_text": "captured"
+    },
+    {
+        "id": 2,
+        "text": "______ is not innocent such as Uday",
+        "options": ["A. Method", "B. System", "C. Process", "D. Harmit"],
+        "correct": "D",
+        "correct_text": "Harmit"
+    },
+    {
+        "id": 3,
+        "text": "The following ______ has been divided into four segments",
+        "options": ["A. process", "B. sentence", "C. method", "D. system"],
+        "correct": "B",
+        "correct_text": "sentence"
+    },
+    {
+        "id": 4,
+        "text": "If there is no need to substitute it, select No substitution ______",
+        "options": ["A. method", "B. required", "C. process", "D. system"],
+        "correct": "B",
+        "correct_text": "required"
+    },
+    {
+        "id": 5,
+        "text": "But, when the ______ was thrown in front of the lion, the lion licked him and quietly sat beside him",
+        "options": ["A. system", "B. slave", "C. method", "D. process"],
+        "correct": "B",
+        "correct_text": "slave"
+    },
+    {
+        "id": 6,
+        "text": "______ out a tower of pots",
+        "options": ["A. knock", "B. process", "C. method", "D. system"],
+        "correct": "A",
+        "correct_text": "knock"
+    },
+    {
+        "id": 7,
+        "text": "The following sentence has been divided into four ______",
+        "options": ["A. method", "B. system", "C. process", "D. segments"],
+        "correct": "D",
+        "correct_text": "segments"
+    },
+    {
+        "id": 8,
+        "text": "How is the structure of health infrastructure and health care system in ______",
+        "options": ["A. Process", "B. Method", "C. System", "D. India"],
+        "correct": "D",
+        "correct_text": "India"
+    },
+    {
+        "id": 9,
+        "text": "Parts of the following sentence have been underlined and given as ______",
+        "options": ["A. options", "B. process", "C. system", "D. method"],
+        "correct": "A",
+        "correct_text": "options"
+    },
+    {
+        "id": 10,
+        "text": "Read the passage carefully and select the most ______ option to fill in each blank",
+        "options": ["A. appropriate", "B. process", "C. system", "D. method"],
+        "correct": "A",
+        "correct_text": "appropriate"
+    }
+]
+
+# Serialized once; the fallback /api/questions body never changes
+_FALLBACK_JSON = app.json.dumps({
+    'questions': _FALLBACK_QUESTIONS,
+    'total': len(_FALLBACK_QUESTIONS),
+    'status': 'success',
+    'source': 'Fallback Questions'
+}).encode('utf-8')
+_FALLBACK_ETAG = _etag(_FALLBACK_JSON)
 
 # Initialize the quiz generator lazily
 quiz_generator = None
@@ -420,25 +621,25 @@ def get_sample_files():
     files = []
     
     if sample_files_dir.exists():
-        for file_path in sample_files_dir.glob("*.*"):
-            if file_path.suffix.lower() in ['.pdf', '.txt', '.docx', '.doc']:
-                file_size = file_path.stat().st_size
-                # Format file size
-                if file_size >= 1024 * 1024:
-                    size_str = f"{file_size / (1024 * 1024):.1f} MB"
-                elif file_size >= 1024:
-                    size_str = f"{file_size / 1024:.1f} KB"
-                else:
-                    size_str = f"{file_size} B"
+        # scandir filters on the entry's name and type without building Path
+        # objects; each listed file is stat-ed once
+        with os.scandir(sample_files_dir) as entries:
+            for entry in entries:
+                ext = os.path.splitext(entry.name)[1][1:].lower()
+                if ext not in _ALLOWED_EXTS or not entry.is_file():
+                    continue
                     
                 files.append({
-                    'name': file_path.name,
-                    'size': size_str,
-                    'type': file_path.suffix[1:].lower(),
-                    'description': f"Sample {file_path.suffix[1:].upper()} file for quiz generation"
+                    'name': entry.name,
+                    'size': _fmt_size(entry.stat().st_size),
+                    'type': ext,
+                    'description': f"Sample {ext.upper()} file for quiz generation"
                 })
     
-    return jsonify(files)
+    # Let polling clients revalidate with If-None-Match and get a 304
+    response = jsonify(files)
+    response.set_etag(_etag(response.get_data()))
+    return response.make_conditional(request)
 
 @app.route('/api/upload', methods=['POST'])
 def upload_files():
@@ -464,8 +665,10 @@ def upload_files():
         print(f"🔍 Processing file {i}: filename='{file.filename}', content_type='{file.content_type}'")
         if file.filename:
             try:
-                file_content = file.read()
-                file_size = len(file_content)
+                # Measure the size by seeking instead of reading the upload
+                file.stream.seek(0, os.SEEK_END)
+                file_size = file.stream.tell()
+                file.stream.seek(0)
                 print(f"📄 File {file.filename}: {file_size} bytes")
                 
                 uploaded_files.append({
@@ -473,7 +676,6 @@ def upload_files():
                     'size': file_size,
                     'type': file.filename.split('.')[-1].lower()
                 })
-                file.seek(0)  # Reset file pointer
             except Exception as e:
                 print(f"❌ Error processing file {file.filename}: {e}")
                 return jsonify({'error': f'Error processing file {file.filename}', 'detail': str(e)}), 400
@@ -491,7 +693,7 @@ def preview_samples():
     """API endpoint to preview sample file contents."""
     try:
         sample_files = []
-        content = ""
+        content_parts = []
         metadata = []
         
         # Get list of PDF files in sample-files directory
@@ -509,6 +711,10 @@ def preview_samples():
                         'lastModified': datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
                     })
                     
+                    # Don't parse giant PDFs just to show an excerpt
+                    if stat.st_size > _MAX_PREVIEW_SIZE:
+                        continue
+                    
                     # Try to extract some content for preview
                     try:
                         with open(pdf_file, 'rb') as file:
@@ -516,13 +722,13 @@ def preview_samples():
                             if len(pdf_reader.pages) > 0:
                                 # Extract text from first page
                                 page_text = pdf_reader.pages[0].extract_text()
-                                content += f"\n\n=== {pdf_file.name} ===\n\n"
-                                content += page_text[:500] + ("..." if len(page_text) > 500 else "")
+                                snippet = page_text[:500] + ("..." if len(page_text) > 500 else "")
+                                content_parts.append(f"=== {pdf_file.name} ===\n\n{snippet}")
                                 
                                 # Update metadata with page count
                                 metadata[-1]['pages'] = len(pdf_reader.pages)
                     except Exception as e:
-                        content += f"\n\n=== {pdf_file.name} ===\n\nError reading PDF: {str(e)}"
+                        content_parts.append(f"=== {pdf_file.name} ===\n\nError reading PDF: {str(e)}")
                         
                 except Exception as e:
                     print(f"Error processing {pdf_file}: {e}")
@@ -538,7 +744,7 @@ def preview_samples():
         
         return jsonify({
             'success': True,
-            'content': content.strip(),
+            'content': "\n\n".join(content_parts).strip(),
             'metadata': metadata
         })
         
@@ -553,8 +759,6 @@ def preview_samples():
 @app.route('/api/start-extraction', methods=['POST'])
 def start_extraction():
     """Start the question extraction process in background."""
-    global extraction_progress
-    
     # Get extraction options from request
     data = request.get_json() or {}
     options = {
@@ -567,15 +771,6 @@ def start_extraction():
     
     print(f"🎯 Starting extraction with options: {options}")
     
-    # Reset progress
-    extraction_progress = {
-        'status': 'starting',
-        'progress': 0,
-        'message': 'Initializing extraction...',
-        'questions_found': 0,
-        'current_file': ''
-    }
-    
     def run_extraction():
         try:
             generator = get_quiz_generator()
@@ -586,17 +781,22 @@ def start_extraction():
                 # Process uploaded files (if any)
                 generator.load_questions_from_pdfs_with_progress()
         except Exception as e:
-            global extraction_progress
-            extraction_progress.update({
+            _update_progress({
                 'status': 'error',
                 'message': f'Extraction failed: {str(e)}'
             })
             print(f"❌ Extraction error: {e}")
     
-    # Start extraction in background thread
-    thread = threading.Thread(target=run_extraction)
-    thread.daemon = True
-    thread.start()
+    # Start extraction on the background worker
+    started = _start_extraction_job(run_extraction, {
+        'status': 'starting',
+        'progress': 0,
+        'message': 'Initializing extraction...',
+        'questions_found': 0,
+        'current_file': ''
+    })
+    if not started:
+        return jsonify({'status': 'busy', 'message': 'An extraction is already running'}), 409
     
     return jsonify({'status': 'started', 'options': options})
 
@@ -605,14 +805,36 @@ def get_extraction_progress():
     """Get the current extraction progress."""
     return jsonify(extraction_progress)
 
+@app.route('/api/extraction-progress-stream')
+def stream_extraction_progress():
+    """Push extraction progress to the client as server-sent events."""
+    def generate():
+        deadline = time.monotonic() + _STREAM_MAX_SECONDS
+        # Ask the browser to reconnect quickly once this stream ends
+        yield "retry: 1000\n\n"
+        while True:
+            with _progress_changed:
+                snapshot = dict(extraction_progress)
+            yield f"data: {app.json.dumps(snapshot)}\n\n"
+            if snapshot['status'] == 'idle' or snapshot['status'] in _FINISHED_STATUSES:
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            with _progress_changed:
+                # Sleep until the next real update or the end of the stream
+                if extraction_progress == snapshot:
+                    _progress_changed.wait(timeout=remaining)
+    
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
 @app.route('/exam')
 def exam():
     """Serve the advanced exam interface page."""
     try:
-        with open('advanced_exam_interface.html', 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        return html_content
-    except FileNotFoundError:
+        return send_from_directory('.', 'advanced_exam_interface.html')
+    except NotFound:
         return '''
         <h1>Error: Advanced exam interface files not found</h1>
         <p>Please make sure advanced_exam_interface.html, styles.css, and script_api.js are in the same directory as this server.</p>
@@ -629,16 +851,32 @@ def exam():
 def get_questions():
     """API endpoint to get all quiz questions."""
     generator = get_quiz_generator()
-    if not generator.questions:
+    # Work from one snapshot; a regeneration may replace the list meanwhile
+    questions = generator.questions
+    if not questions:
         # If no questions loaded, return fallback
-        generator.questions = generator.get_fallback_questions()
+        questions = generator.get_fallback_questions()
+        generator.questions = questions
+        generator._questions_response = (questions, _FALLBACK_JSON, _FALLBACK_ETAG)
     
-    return jsonify({
-        'questions': generator.questions,
-        'total': len(generator.questions),
-        'status': 'success',
-        'source': 'Advanced PDF Extraction' if len(generator.questions) > 10 else 'Fallback Questions'
-    })
+    # Serialize once per question set; exam clients all get the same body.
+    # A body built for a list that has since been replaced is never stored.
+    cached = generator._questions_response
+    if cached is None or cached[0] is not questions:
+        body = app.json.dumps({
+            'questions': questions,
+            'total': len(questions),
+            'status': 'success',
+            'source': 'Advanced PDF Extraction' if len(questions) > 10 else 'Fallback Questions'
+        }).encode('utf-8')
+        cached = (questions, body, _etag(body))
+        if generator.questions is questions:
+            generator._questions_response = cached
+    _, body, etag = cached
+    
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
 
 @app.route('/api/submit', methods=['POST'])
 def submit_exam():
@@ -652,12 +890,13 @@ def submit_exam():
     correct = 0
     total = len(generator.questions)
     
-    for question in generator.questions:
-        user_answer = answers.get(str(question['id']))
-        if user_answer:
-            # Convert user answer (1,2,3,4) to letter (A,B,C,D)
-            answer_letter = chr(64 + int(user_answer))
-            if answer_letter == question['correct']:
+    id_index = generator._id_index
+    correct_codes = generator._correct_codes
+    for question_id, user_answer in answers.items():
+        index = id_index.get(question_id)
+        if index is not None and user_answer:
+            # User answers 1-4 map onto the letter codes of A-D
+            if 64 + int(user_answer) == correct_codes[index]:
                 correct += 1
     
     percentage = round((correct / total) * 100) if total > 0 else 0
@@ -678,46 +917,35 @@ def submit_exam():
 def serve_styles():
     """Serve the CSS file."""
     try:
-        with open('styles.css', 'r', encoding='utf-8') as f:
-            css_content = f.read()
-        response = app.response_class(css_content, mimetype='text/css')
-        return response
-    except FileNotFoundError:
+        return send_from_directory('.', 'styles.css', mimetype='text/css')
+    except NotFound:
         return "/* CSS file not found */", 404
 
 @app.route('/script_api.js')
 def serve_script():
     """Serve the JavaScript file."""
     try:
-        with open('script_api.js', 'r', encoding='utf-8') as f:
-            js_content = f.read()
-        response = app.response_class(js_content, mimetype='application/javascript')
-        return response
-    except FileNotFoundError:
+        return send_from_directory('.', 'script_api.js', mimetype='application/javascript')
+    except NotFound:
         return "// JavaScript file not found", 404
 
 @app.route('/api/regenerate')
 def regenerate_questions():
     """Regenerate questions from PDFs with progress tracking."""
-    global extraction_progress
+    def run_regeneration():
+        generator = get_quiz_generator()
+        generator.load_questions_from_pdfs_with_progress()
     
-    # Reset progress
-    extraction_progress = {
+    # Start regeneration on the background worker
+    started = _start_extraction_job(run_regeneration, {
         'status': 'idle',
         'progress': 0,
         'message': 'Ready to regenerate',
         'questions_found': 0,
         'current_file': ''
-    }
-    
-    # Start regeneration in background
-    def run_regeneration():
-        generator = get_quiz_generator()
-        generator.load_questions_from_pdfs_with_progress()
-    
-    thread = threading.Thread(target=run_regeneration)
-    thread.daemon = True
-    thread.start()
+    })
+    if not started:
+        return jsonify({'status': 'busy', 'message': 'An extraction is already running'}), 409
     
     return jsonify({
         'message': 'Question regeneration started',
@@ -730,4 +958,7 @@ if __name__ == '__main__':
     print("🌐 Server starting at http://localhost:5000")
     print("🚀 Go to http://localhost:5000/ to start file selection")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    if WAITRESS_AVAILABLE:
+        serve(app, host='0.0.0.0', port=5000, threads=8)
+    else:
+        app.run(debug=False, threaded=True, host='0.0.0.0', port=5000)
@@ -7,6 +7,13 @@ from flask import Flask, render_template, jsonify, request, send_from_directory
 from flask_cors import CORS
 import os
 
+try:
+    from waitress import serve
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+    print("⚠️ waitress not available. Falling back to the Flask development server.")
+
 app = Flask(__name__)
 CORS(app)
 
@@ -46,4 +53,7 @@ def test_api():
 if __name__ == '__main__':
     print("🚀 Starting minimal Flask server...")
     print("📍 Server will be available at: http://localhost:5000")
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    if WAITRESS_AVAILABLE:
+        serve(app, host='0.0.0.0', port=5000, threads=8)
+    else:
+        app.run(debug=False, threaded=True, host='0.0.0.0', port=5000)
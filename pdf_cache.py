@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Shared PDF Reader Cache
+Keeps parsed PdfReader objects around so that scripts opening the same PDF
+more than once only pay for cross-reference parsing the first time, and
+keeps extracted text on disk so repeat runs can skip parsing altogether.
+"""
+
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from pypdf import PdfReader
+
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+
+# Text extraction backend in use; the backends lay out text differently
+PDF_BACKEND = 'pdfium' if PDFIUM_AVAILABLE else 'pypdf'
+
+# PDFs larger than this are read lazily from an open file instead of from memory
+_MAX_IN_MEMORY_SIZE = 200 * 1024 * 1024
+
+# The reader cache holds at most this many PDF bytes and this many readers
+_MAX_CACHED_BYTES = 64 * 1024 * 1024
+_MAX_CACHED_READERS = 4
+
+# Extracted text saved between runs, keyed by file name, mtime and size
+TEXT_CACHE_DIR = Path(".pdf_text_cache")
+
+_readers = OrderedDict()  # (path, mtime_ns) -> (reader, size), oldest first
+_readers_lock = threading.Lock()
+_cached_bytes = 0
+
+def _load_reader(path, size):
+    """Open a PDF, keeping very large files on disk instead of in memory.
+
+    Given a path, pypdf reads the whole file into memory itself; handing it
+    an open file instead makes it seek and read objects only as needed.
+    """
+    if size > _MAX_IN_MEMORY_SIZE:
+        handle = open(path, 'rb')
+        try:
+            reader = PdfReader(handle)
+        except Exception:
+            handle.close()
+            raise
+        # pypdf never closes a stream it was handed, so close the file once
+        # the reader is gone; readers this large are never cached
+        weakref.finalize(reader, handle.close)
+        return reader
+    return PdfReader(path)
+
+def open_pdf_reader(pdf_path):
+    """Return the shared PdfReader for a PDF file path.
+
+    Recently used readers are kept while their files add up to less than
+    ``_MAX_CACHED_BYTES``; larger PDFs get a fresh reader every time. The
+    mtime is part of the key, so an edited file is never served stale.
+    """
+    global _cached_bytes
+    path = os.fspath(pdf_path)
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns)
+    with _readers_lock:
+        if key in _readers:
+            _readers.move_to_end(key)
+            return _readers[key][0]
+
+    reader = _load_reader(path, stat.st_size)
+    if stat.st_size > _MAX_CACHED_BYTES:
+        return reader
+
+    with _readers_lock:
+        if key not in _readers:
+            _readers[key] = (reader, stat.st_size)
+            _cached_bytes += stat.st_size
+        while _cached_bytes > _MAX_CACHED_BYTES or len(_readers) > _MAX_CACHED_READERS:
+            _, (_, size) = _readers.popitem(last=False)
+            _cached_bytes -= size
+    return reader
+
+def page_texts(pdf_path):
+    """Yield the text of each page, using the C-backed PDFium when installed."""
+    if PDFIUM_AVAILABLE:
+        pdf = pdfium.PdfDocument(os.fspath(pdf_path))
+        try:
+            for page in pdf:
+                yield page.get_textpage().get_text_range()
+        finally:
+            pdf.close()
+    else:
+        for page in open_pdf_reader(pdf_path).pages:
+            yield page.extract_text()
+
+def probe_pdf(pdf_path):
+    """Return (encrypted, page count, first page text) using the page_texts backend."""
+    if PDFIUM_AVAILABLE:
+        try:
+            pdf = pdfium.PdfDocument(os.fspath(pdf_path))
+        except pdfium.PdfiumError as e:
+            if e.err_code == pdfium.raw.FPDF_ERR_PASSWORD:
+                return True, 0, ""
+            raise
+        try:
+            if len(pdf) == 0:
+                return False, 0, ""
+            return False, len(pdf), pdf[0].get_textpage().get_text_range()
+        finally:
+            pdf.close()
+
+    reader = open_pdf_reader(pdf_path)
+    if reader.is_encrypted:
+        return True, 0, ""
+    if len(reader.pages) == 0:
+        return False, 0, ""
+    return False, len(reader.pages), reader.pages[0].extract_text()
+
+def _text_cache_file(pdf_path, kind):
+    """Where text of this ``kind`` for ``pdf_path`` is saved between runs."""
+    path = Path(pdf_path)
+    stat = path.stat()
+    return TEXT_CACHE_DIR / f"{path.name}.{stat.st_mtime_ns}.{stat.st_size}.{kind}.txt"
+
+def cached_text(pdf_path, kind):
+    """Return text saved by an earlier ``cached_pdf_text`` call, or None."""
+    try:
+        return _text_cache_file(pdf_path, kind).read_text(encoding='utf-8')
+    except OSError:
+        return None
+
+def cached_pdf_text(pdf_path, kind, extract):
+    """Return ``extract(pdf_path)``, reusing text saved by an earlier run.
+
+    ``kind`` names the text layout the caller produces, so scripts that
+    format extracted text differently never share cache entries. Callers
+    using ``page_texts`` should include ``PDF_BACKEND`` in it.
+    """
+    cache_file = _text_cache_file(pdf_path, kind)
+    try:
+        return cache_file.read_text(encoding='utf-8')
+    except OSError:
+        pass
+
+    text = extract(pdf_path)
+    if text:
+        try:
+            TEXT_CACHE_DIR.mkdir(exist_ok=True)
+            # Write to a temp name first so parallel workers never read half a file
+            tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            tmp_file.write_text(text, encoding='utf-8')
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass  # The cache is only an optimisation
+    return text
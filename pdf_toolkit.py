@@ -4,19 +4,33 @@ Comprehensive PyPDF Toolkit
 This script demonstrates the full range of pypdf capabilities.
 """
 
-from pypdf import PdfReader, PdfWriter
+from pypdf import PdfWriter
+from pdf_cache import open_pdf_reader
 from pathlib import Path
 import io
+import os
 import sys
 
+def _page_count(reader):
+    """Page count from the root of the page tree, without loading every page."""
+    try:
+        return int(reader.trailer['/Root']['/Pages']['/Count'])
+    except (KeyError, TypeError, ValueError):
+        return len(reader.pages)
+
 def analyze_pdf(pdf_path):
-    """Analyze a PDF file and return detailed information."""
+    """Analyze a PDF file and return detailed information.
+    
+    Metadata, encryption and page count only need the trailer and a couple
+    of objects; only the first page's content is parsed, for the preview.
+    """
     try:
-        reader = PdfReader(pdf_path)
+        reader = open_pdf_reader(pdf_path)
+        num_pages = _page_count(reader)
         
         info = {
             'filename': pdf_path.name,
-            'pages': len(reader.pages),
+            'pages': num_pages,
             'metadata': {},
             'text_preview': "",
             'is_encrypted': reader.is_encrypted
@@ -29,7 +43,7 @@ def analyze_pdf(pdf_path):
                 info['metadata'][clean_key] = str(value) if value else 'N/A'
         
         # Extract text from first page
-        if len(reader.pages) > 0:
+        if num_pages > 0:
             first_page_text = reader.pages[0].extract_text()
             info['text_preview'] = first_page_text[:300] + "..." if len(first_page_text) > 300 else first_page_text
         
@@ -44,7 +58,7 @@ def merge_pdfs(pdf_files, output_path):
         writer = PdfWriter()
         
         for pdf_file in pdf_files:
-            reader = PdfReader(pdf_file)
+            reader = open_pdf_reader(pdf_file)
             for page in reader.pages:
                 writer.add_page(page)
         
@@ -59,19 +73,23 @@ def merge_pdfs(pdf_files, output_path):
 def split_pdf(pdf_path, output_dir):
     """Split a PDF into individual pages."""
     try:
-        reader = PdfReader(pdf_path)
+        reader = open_pdf_reader(pdf_path)
+        num_pages = len(reader.pages)
         output_dir = Path(output_dir)
         output_dir.mkdir(exist_ok=True)
         
+        # One pass over the pages proxy instead of an indexed lookup per page
         for page_num, page in enumerate(reader.pages):
             writer = PdfWriter()
             writer.add_page(page)
             
+            # Serialize in memory, then write each file in one go
+            buffer = io.BytesIO()
+            writer.write(buffer)
             output_path = output_dir / f"{pdf_path.stem}_page_{page_num + 1}.pdf"
-            with open(output_path, 'wb') as output_file:
-                writer.write(output_file)
+            output_path.write_bytes(buffer.getvalue())
         
-        return True, f"Split {len(reader.pages)} pages into {output_dir}"
+        return True, f"Split {num_pages} pages into {output_dir}"
     
     except Exception as e:
         return False, f"Error splitting PDF: {e}"
@@ -79,12 +97,11 @@ def split_pdf(pdf_path, output_dir):
 def extract_text_from_all_pages(pdf_path):
     """Extract text from all pages of a PDF."""
     try:
-        reader = PdfReader(pdf_path)
-        all_text = []
-        
-        for page_num, page in enumerate(reader.pages):
-            text = page.extract_text()
-            all_text.append(f"=== PAGE {page_num + 1} ===\n{text}\n")
+        reader = open_pdf_reader(pdf_path)
+        all_text = [
+            f"=== PAGE {page_num + 1} ===\n{page.extract_text()}\n"
+            for page_num, page in enumerate(reader.pages)
+        ]
         
         return True, "\n".join(all_text)
     
@@ -101,7 +118,14 @@ def main():
         print("❌ Resources directory not found!")
         return
     
-    pdf_files = list(resources_dir.glob("*.pdf"))
+    # scandir filters on the directory entry's name and type; each PDF is
+    # stat-ed once here and the demos below reuse the size
+    with os.scandir(resources_dir) as entries:
+        sizes = {
+            Path(e.path): e.stat().st_size
+            for e in entries if e.name.lower().endswith('.pdf') and e.is_file()
+        }
+    pdf_files = list(sizes)
     if not pdf_files:
         print("❌ No PDF files found!")
         return
@@ -155,7 +179,7 @@ def main():
         print("-" * 40)
         
         sample_pdf = pdf_files[0]
-        if Path(sample_pdf).stat().st_size < 1000000:  # Only split smaller files
+        if sizes[sample_pdf] < 1000000:  # Only split smaller files
             print(f"📄 Splitting: {sample_pdf.name}")
             
             success, result = split_pdf(sample_pdf, "split_output")
@@ -172,7 +196,7 @@ def main():
         print("-" * 40)
         
         # Take first 2 small PDFs for merging
-        small_pdfs = [pdf for pdf in pdf_files[:3] if Path(pdf).stat().st_size < 500000]
+        small_pdfs = [pdf for pdf in pdf_files[:3] if sizes[pdf] < 500000]
         
         if len(small_pdfs) >= 2:
             print(f"📚 Merging {len(small_pdfs)} PDFs:")
@@ -6,22 +6,59 @@ Creates properly formatted quiz questions for educational use.
 
 import os
 import re
-from pypdf import PdfReader
+from pdf_cache import PDF_BACKEND, cached_pdf_text, cached_text, page_texts, probe_pdf
 from pathlib import Path
 import random
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+_WS = re.compile(r'\s+')
+_PUNCT_STRIP = re.compile(r'[^\w\s.,!?;:-]')
+
+class _PunctStripTable(dict):
+    """str.translate table deleting the characters _PUNCT_STRIP matches.
+    
+    Entries are filled in on first sight, so the table only ever holds the
+    characters that actually occur instead of all of Unicode.
+    """
+    
+    def __missing__(self, codepoint):
+        result = None if _PUNCT_STRIP.match(chr(codepoint)) else codepoint
+        self[codepoint] = result
+        return result
+
+_PUNCT_TABLE = _PunctStripTable()
+_SPLIT = re.compile(r'[.!?]+')
+# Years/numbers, question and page numbers, and exam references
+_REJECT = re.compile(r'\d{4}|^Q |^Page |CHSL')
+# Whole words of three or more letters
+_ALPHA_WORDS = re.compile(r'(?<!\S)[^\W\d_]{3,}(?!\S)')
+
+# Generic wrong options, in both cases so they match the answer's case
+_WRONG_LOWER = (
+    'system', 'process', 'method', 'approach', 'factor',
+    'element', 'aspect', 'concept', 'principle', 'structure'
+)
+_WRONG_CAPITAL = tuple(wrong.capitalize() for wrong in _WRONG_LOWER)
+
+# Probe limits: bigger files are skipped, and a first page with less text
+# than this is taken as a scanned or image-only document
+_MAX_PDF_SIZE = 50 * 1024 * 1024
+_MIN_PROBE_CHARS = 50
+
+# Cache kind for the joined page text, per extraction backend
+_TEXT_KIND = f'joined-{PDF_BACKEND}'
+
+# Common words that make poor blanks
+_STOPWORDS = frozenset((
+    'that', 'this', 'with', 'from', 'they', 'have', 'been', 'were', 'will',
+    'when', 'where', 'which', 'their', 'there', 'these', 'those'
+))
+
 def extract_text_from_pdf(pdf_path):
     """Extract all text from a PDF file."""
     try:
-        reader = PdfReader(pdf_path)
-        text = ""
-        
-        for page in reader.pages:
-            page_text = page.extract_text()
-            text += page_text + " "
-            
-        return text
+        return cached_pdf_text(pdf_path, _TEXT_KIND, lambda path: " ".join(page_texts(path)))
     except Exception as e:
         print(f"Error reading PDF {pdf_path}: {e}")
         return None
@@ -32,58 +69,92 @@ def extract_meaningful_sentences(text):
         return []
     
     # Clean up text
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'[^\w\s.,!?;:-]', '', text)
+    text = _WS.sub(' ', text)
+    # translate has a C fast path for pure-ASCII text; anything else is
+    # cheaper through the regex than through per-character table lookups
+    if text.isascii():
+        text = text.translate(_PUNCT_TABLE)
+    else:
+        text = _PUNCT_STRIP.sub('', text)
     
     # Split into sentences
-    sentences = re.split(r'[.!?]+', text)
+    sentences = _SPLIT.split(text)
     
     cleaned_sentences = []
     for sentence in sentences:
         sentence = sentence.strip()
         
         # Filter for educational content
-        if (20 < len(sentence) < 120 and 
+        if (20 < len(sentence) < 120 and
             sentence.count(' ') > 3 and
-            not re.search(r'\d{4}', sentence) and  # Avoid years/numbers
-            not sentence.startswith('Q ') and      # Avoid question numbers
-            not sentence.startswith('Page ') and   # Avoid page numbers
-            'CHSL' not in sentence and             # Avoid exam references
-            len([w for w in sentence.split() if w.isalpha() and len(w) > 2]) >= 4):
+            not _REJECT.search(sentence) and
+            len(_ALPHA_WORDS.findall(sentence)) >= 4):
             cleaned_sentences.append(sentence)
     
     return cleaned_sentences
 
+def _skip_reason(pdf_path):
+    """Cheap probe before full extraction: why this PDF isn't worth parsing, or None."""
+    if os.path.getsize(pdf_path) > _MAX_PDF_SIZE:
+        return "larger than 50 MB"
+    
+    encrypted, page_count, first_page_text = probe_pdf(pdf_path)
+    if encrypted:
+        return "encrypted"
+    if page_count == 0:
+        return "no pages"
+    # Image-only scans have (almost) no text layer on the first page either
+    if len(first_page_text.strip()) < _MIN_PROBE_CHARS:
+        return "no text on first page"
+    return None
+
+def _process_one(pdf_path):
+    """Read one PDF and return (sentences, skip reason).
+    
+    Sentences are None when the PDF was skipped or couldn't be read.
+    """
+    # Text saved by an earlier run already passed the probe
+    text = cached_text(pdf_path, _TEXT_KIND)
+    if text is None:
+        try:
+            reason = _skip_reason(pdf_path)
+        except Exception as e:
+            return None, f"unreadable: {e}"
+        if reason:
+            return None, reason
+        text = extract_text_from_pdf(pdf_path)
+    if not text:
+        return None, None
+    return extract_meaningful_sentences(text), None
+
 def create_professional_quiz(sentences, num_questions=10):
     """Create professional quiz questions."""
     questions = []
-    used_sentences = set()
     
+    # Drop repeated sentences once up front (keeps first-seen order)
+    sentences = list(dict.fromkeys(sentences))
     random.shuffle(sentences)
     
     for sentence in sentences:
         if len(questions) >= num_questions:
             break
             
-        if sentence in used_sentences:
-            continue
-            
         words = sentence.split()
         
         # Find good words to blank out (nouns, verbs, adjectives)
-        important_words = []
-        for i, word in enumerate(words):
-            if (len(word) > 4 and 
+        important_words = [
+            (i, word) for i, word in enumerate(words)
+            if (len(word) > 4 and
                 word.isalpha() and
-                word.lower() not in ['that', 'this', 'with', 'from', 'they', 'have', 'been', 'were', 'will', 'when', 'where', 'which', 'their', 'there', 'these', 'those'] and
-                not word.isupper()):
-                important_words.append((i, word))
+                word.lower() not in _STOPWORDS and
+                not word.isupper())
+        ]
         
-        if len(important_words) < 1:
+        if not important_words:
             continue
             
         # Select the best word to blank
-        word_index, word_to_blank = random.choice(important_words)
+        word_index, word_to_blank = important_words[random.randrange(len(important_words))]
         
         # Create multiple choice options
         question_words = words.copy()
@@ -91,12 +162,13 @@ def create_professional_quiz(sentences, num_questions=10):
         question_text = " ".join(question_words)
         
         # Generate plausible wrong answers (this is simplified)
-        options = [word_to_blank]
-        # Add some generic wrong options
-        wrong_options = ['system', 'process', 'method', 'approach', 'factor', 'element', 'aspect', 'concept', 'principle', 'structure']
-        for wrong in wrong_options:
-            if wrong != word_to_blank.lower() and len(options) < 4:
-                options.append(wrong.capitalize() if word_to_blank[0].isupper() else wrong)
+        # Add some generic wrong options, matching the answer's case
+        pool = _WRONG_CAPITAL if word_to_blank[0].isupper() else _WRONG_LOWER
+        answer_lower = word_to_blank.lower()
+        options = [word_to_blank] + [
+            wrong for wrong, wrong_lower in zip(pool, _WRONG_LOWER)
+            if wrong_lower != answer_lower
+        ][:3]
         
         # Shuffle options
         random.shuffle(options)
@@ -109,34 +181,37 @@ def create_professional_quiz(sentences, num_questions=10):
             'answer_text': word_to_blank,
             'original': sentence
         })
-        
-        used_sentences.add(sentence)
     
     return questions
 
 def save_quiz_to_file(questions, filename="generated_quiz.txt"):
     """Save the quiz to a text file."""
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write("=" * 80 + "\n")
-        f.write("QUIZ GENERATED FROM PDF FILES\n")
-        f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"Total Questions: {len(questions)}\n")
-        f.write("=" * 80 + "\n\n")
+    parts = [
+        "=" * 80 + "\n",
+        "QUIZ GENERATED FROM PDF FILES\n",
+        f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+        f"Total Questions: {len(questions)}\n",
+        "=" * 80 + "\n\n"
+    ]
+    append = parts.append
+    
+    for i, q in enumerate(questions, 1):
+        append(f"Question {i}:\n{q['question']}\n\n")
         
-        for i, q in enumerate(questions, 1):
-            f.write(f"Question {i}:\n")
-            f.write(f"{q['question']}\n\n")
-            
-            for j, option in enumerate(q['options']):
-                f.write(f"{chr(65 + j)}. {option}\n")
-            
-            f.write(f"\nCorrect Answer: {q['correct_answer']} ({q['answer_text']})\n")
-            f.write("-" * 50 + "\n\n")
+        for j, option in enumerate(q['options']):
+            append(f"{chr(65 + j)}. {option}\n")
         
-        f.write("\nANSWER KEY:\n")
-        f.write("-" * 20 + "\n")
-        for i, q in enumerate(questions, 1):
-            f.write(f"{i}. {q['correct_answer']}\n")
+        append(f"\nCorrect Answer: {q['correct_answer']} ({q['answer_text']})\n")
+        append("-" * 50 + "\n\n")
+    
+    append("\nANSWER KEY:\n")
+    append("-" * 20 + "\n")
+    for i, q in enumerate(questions, 1):
+        append(f"{i}. {q['correct_answer']}\n")
+    
+    # Build the whole file in memory and write it in one call
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write("".join(parts))
 
 def main():
     """Main function to generate professional quiz."""
@@ -159,16 +234,20 @@ def main():
     all_sentences = []
     processed_files = 0
     
-    for pdf_file in pdf_files:
-        print(f"  📄 Reading {pdf_file.name}...")
-        text = extract_text_from_pdf(pdf_file)
-        if text:
-            sentences = extract_meaningful_sentences(text)
-            all_sentences.extend(sentences)
-            processed_files += 1
-            print(f"     ✅ Added {len(sentences)} sentences")
-        else:
-            print(f"     ❌ Failed to process")
+    # Parsing is CPU-bound, so each PDF goes to its own worker process
+    with ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, 8)) as executor:
+        results = executor.map(_process_one, pdf_files, chunksize=4)
+        
+        for pdf_file, (sentences, skip_reason) in zip(pdf_files, results):
+            print(f"  📄 Reading {pdf_file.name}...")
+            if skip_reason:
+                print(f"     ⏭️  Skipped ({skip_reason})")
+            elif sentences is not None:
+                all_sentences.extend(sentences)
+                processed_files += 1
+                print(f"     ✅ Added {len(sentences)} sentences")
+            else:
+                print(f"     ❌ Failed to process")
     
     if not all_sentences:
         print("❌ No suitable content found for quiz generation")
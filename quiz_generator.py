@@ -7,22 +7,27 @@ to extract text from PDF files.
 
 import os
 import re
-from pypdf import PdfReader
+from pdf_cache import PDF_BACKEND, cached_pdf_text, page_texts
 from pathlib import Path
 import random
 
+_WS = re.compile(r'\s+')
+_SPLIT = re.compile(r'[.!?]+')
+_PAGE_MARK = re.compile(r'--- Page \d+ ---')
+
+def _paged_text(pdf_path):
+    """All page texts, each preceded by a page marker."""
+    parts = []
+    
+    for page_num, page_text in enumerate(page_texts(pdf_path)):
+        parts.append(f"\n--- Page {page_num + 1} ---\n{page_text}")
+        
+    return "".join(parts)
+
 def extract_text_from_pdf(pdf_path):
     """Extract all text from a PDF file."""
     try:
-        reader = PdfReader(pdf_path)
-        text = ""
-        
-        for page_num, page in enumerate(reader.pages):
-            page_text = page.extract_text()
-            text += f"\n--- Page {page_num + 1} ---\n"
-            text += page_text
-            
-        return text
+        return cached_pdf_text(pdf_path, f'paged-{PDF_BACKEND}', _paged_text)
     except Exception as e:
         print(f"Error reading PDF {pdf_path}: {e}")
         return None
@@ -33,15 +38,15 @@ def extract_sentences(text):
         return []
     
     # Simple sentence splitting
-    sentences = re.split(r'[.!?]+', text)
+    sentences = _SPLIT.split(text)
     
     # Clean up sentences
     cleaned_sentences = []
     for sentence in sentences:
         sentence = sentence.strip()
         # Remove page markers and other formatting
-        sentence = re.sub(r'--- Page \d+ ---', '', sentence)
-        sentence = re.sub(r'\s+', ' ', sentence)  # Replace multiple spaces with single space
+        sentence = _PAGE_MARK.sub('', sentence)
+        sentence = _WS.sub(' ', sentence)  # Replace multiple spaces with single space
         
         # Keep sentences that are reasonable length and contain words
         if len(sentence) > 20 and len(sentence) < 200 and sentence.count(' ') > 3:
@@ -42,49 +42,101 @@ class ExamInterface {
             
             if (extractionStatus) extractionStatus.textContent = 'Connecting...';
             
-            // First check if extraction is in progress
-            let extractionComplete = false;
-            let attempts = 0;
-            const maxAttempts = 60; // 60 seconds timeout
+            const showProgress = (progressData) => {
+                // Update loading UI with progress
+                if (loadingBar) loadingBar.style.width = progressData.progress + '%';
+                if (loadingPercentage) loadingPercentage.textContent = progressData.progress + '%';
+                if (questionsFound) questionsFound.textContent = progressData.questions_found;
+                if (currentFileLoading) currentFileLoading.textContent = progressData.current_file || 'Waiting...';
+                if (extractionStatus) extractionStatus.textContent = progressData.status;
+                
+                if (loadingElement) {
+                    loadingElement.innerHTML = `
+                        📚 ${progressData.message}<br>
+                        🎯 Found ${progressData.questions_found} questions so far<br>
+                        📄 Processing: ${progressData.current_file || 'Initializing...'}
+                    `;
+                }
+            };
             
-            while (!extractionComplete && attempts < maxAttempts) {
-                try {
-                    const progressResponse = await fetch('/api/extraction-progress');
-                    const progressData = await progressResponse.json();
+            if (window.EventSource) {
+                // Let the server push progress updates as they happen
+                await new Promise((resolve) => {
+                    const source = new EventSource('/api/extraction-progress-stream');
+                    let startRequested = false;
                     
-                    // Update loading UI with progress
-                    if (loadingBar) loadingBar.style.width = progressData.progress + '%';
-                    if (loadingPercentage) loadingPercentage.textContent = progressData.progress + '%';
-                    if (questionsFound) questionsFound.textContent = progressData.questions_found;
-                    if (currentFileLoading) currentFileLoading.textContent = progressData.current_file || 'Waiting...';
-                    if (extractionStatus) extractionStatus.textContent = progressData.status;
+                    // Like the polling loop, stop waiting after 60 seconds and
+                    // fall through to loading whatever questions are available
+                    const finish = () => {
+                        clearTimeout(timeout);
+                        source.close();
+                        resolve();
+                    };
+                    const timeout = setTimeout(() => {
+                        console.log('⚠️ Progress stream timed out, trying direct question load...');
+                        finish();
+                    }, 60000);
                     
-                    if (loadingElement) {
-                        loadingElement.innerHTML = `
-                            📚 ${progressData.message}<br>
-                            🎯 Found ${progressData.questions_found} questions so far<br>
-                            📄 Processing: ${progressData.current_file || 'Initializing...'}
-                        `;
-                    }
+                    source.onmessage = (event) => {
+                        const progressData = JSON.parse(event.data);
+                        showProgress(progressData);
+                        
+                        if (progressData.status === 'completed') {
+                            finish();
+                        } else if (progressData.status === 'error') {
+                            console.log(`⚠️ Extraction failed (${progressData.message}), trying direct question load...`);
+                            finish();
+                        } else if (progressData.status === 'idle' && !startRequested) {
+                            // Start extraction if not started
+                            startRequested = true;
+                            console.log('🚀 Starting extraction process...');
+                            fetch('/api/start-extraction', { method: 'POST' }).catch((startError) => {
+                                console.log('⚠️ Could not start extraction, trying direct question load...', startError);
+                                finish();
+                            });
+                        }
+                    };
                     
-                    if (progressData.status === 'completed') {
-                        extractionComplete = true;
+                    source.onerror = () => {
+                        // The server ends each stream after a while; the browser
+                        // then reconnects on its own, bounded by the timeout above
+                        if (source.readyState === EventSource.CONNECTING) return;
+                        console.log('⚠️ Progress stream failed, trying direct question load...');
+                        finish();
+                    };
+                });
+            } else {
+                // First check if extraction is in progress
+                let extractionComplete = false;
+                let attempts = 0;
+                const maxAttempts = 60; // 60 seconds timeout
+                
+                while (!extractionComplete && attempts < maxAttempts) {
+                    try {
+                        const progressResponse = await fetch('/api/extraction-progress');
+                        const progressData = await progressResponse.json();
+                        
+                        showProgress(progressData);
+                        
+                        if (progressData.status === 'completed') {
+                            extractionComplete = true;
+                            break;
+                        } else if (progressData.status === 'error') {
+                            throw new Error(progressData.message);
+                        } else if (progressData.status === 'idle') {
+                            // Start extraction if not started
+                            console.log('🚀 Starting extraction process...');
+                            await fetch('/api/start-extraction', { method: 'POST' });
+                        }
+                    
+                    } catch (progressError) {
+                        console.log('⚠️ Progress check failed, trying direct question load...');
                         break;
-                    } else if (progressData.status === 'error') {
-                        throw new Error(progressData.message);
-                    } else if (progressData.status === 'idle') {
-                        // Start extraction if not started
-                        console.log('🚀 Starting extraction process...');
-                        await fetch('/api/start-extraction', { method: 'POST' });
                     }
                     
-                } catch (progressError) {
-                    console.log('⚠️ Progress check failed, trying direct question load...');
-                    break;
+                    await new Promise(resolve => setTimeout(resolve, 1000));
+                    attempts++;
                 }
-                
-                await new Promise(resolve => setTimeout(resolve, 1000));
-                attempts++;
             }
             
             // Now try to load questions
@@ -4,14 +4,16 @@ Test script to check if data extraction is working properly
 """
 
 import requests
-import json
 import time
 
+# One session so every call (and the progress polling) reuses a keep-alive connection
+SESSION = requests.Session()
+
 def test_sample_files_api():
     """Test the sample files API endpoint"""
     print("🧪 Testing sample files API...")
     try:
-        response = requests.get("http://localhost:5000/api/sample-files")
+        response = SESSION.get("http://localhost:5000/api/sample-files")
         if response.status_code == 200:
             files = response.json()
             print(f"✅ Sample files API working. Found {len(files)} files:")
@@ -37,10 +39,9 @@ def test_extraction_api():
             "questionTypes": ["mcq"]
         }
         
-        response = requests.post(
+        response = SESSION.post(
             "http://localhost:5000/api/start-extraction",
-            headers={"Content-Type": "application/json"},
-            data=json.dumps(payload)
+            json=payload
         )
         
         if response.status_code == 200:
@@ -59,8 +60,12 @@ def test_extraction_progress():
     """Test the extraction progress API endpoint"""
     print("\n🧪 Testing extraction progress...")
     try:
-        for i in range(10):  # Check progress for 10 seconds
-            response = requests.get("http://localhost:5000/api/extraction-progress")
+        # Poll quickly at first and back off, so fast extractions are seen
+        # almost immediately without hammering the server on slow ones
+        delay = 0.05
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            response = SESSION.get("http://localhost:5000/api/extraction-progress")
             if response.status_code == 200:
                 progress = response.json()
                 print(f"📊 Progress: {progress['progress']}% - {progress['message']} - Questions: {progress['questions_found']}")
@@ -72,9 +77,10 @@ def test_extraction_progress():
                     print(f"❌ Extraction failed: {progress['message']}")
                     return False
             
-            time.sleep(1)
+            time.sleep(delay)
+            delay = min(delay * 1.5, 1.0)
             
-        print("⚠️ Extraction still in progress after 10 seconds")
+        print("⚠️ Extraction still in progress after 30 seconds")
         return False
     except Exception as e:
         print(f"❌ Error testing extraction progress: {e}")
@@ -84,7 +90,7 @@ def test_questions_api():
     """Test the questions API endpoint"""
     print("\n🧪 Testing questions API...")
     try:
-        response = requests.get("http://localhost:5000/api/questions")
+        response = SESSION.get("http://localhost:5000/api/questions")
         if response.status_code == 200:
             data = response.json()
             questions = data.get('questions', [])
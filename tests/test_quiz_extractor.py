@@ -0,0 +1,148 @@
+"""Test the question extraction in advanced_quiz_extractor."""
+import pytest
+
+from advanced_quiz_extractor import AdvancedQuizExtractor, _extract_one
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from .conftest import RESOURCE_ROOT
+
+
+def write_text_pdf(path, pages):
+    """Write a PDF with one page per list of text lines."""
+    writer = PdfWriter()
+    font = writer._add_object(
+        DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject("/Helvetica"),
+            }
+        )
+    )
+    for lines in pages:
+        page = writer.add_blank_page(612, 792)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})}
+        )
+        operations = ["BT /F1 10 Tf 12 TL 40 780 Td"]
+        operations.extend(f"({line}) Tj T*" for line in lines)
+        operations.append("ET")
+        content = DecodedStreamObject()
+        content.set_data("\n".join(operations).encode())
+        page[NameObject("/Contents")] = writer._add_object(content)
+    writer.write(path)
+
+
+def quiz_lines(count):
+    """Lines of ``count`` four-option questions."""
+    lines = []
+    for number in range(1, count + 1):
+        lines.append(f"{number}. Which statement about topic {number} is correct?")
+        lines.extend(f"{letter}. Answer {letter} for topic {number}" for letter in "ABCD")
+    return lines
+
+
+def split_pages(lines, page_count):
+    """Spread ``lines`` evenly over ``page_count`` pages."""
+    per_page = -(-len(lines) // page_count)
+    return [lines[i : i + per_page] for i in range(0, len(lines), per_page)]
+
+
+def test_extract_one_keeps_questions_split_by_page_breaks(tmp_path):
+    """Questions whose options continue on the next page are all found."""
+    path = tmp_path / "quiz.pdf"
+    # 5 lines per question over 7 pages puts most page breaks mid-question
+    write_text_pdf(path, split_pages(quiz_lines(30), 7))
+
+    _, full_text, questions = _extract_one(str(path), 100)
+
+    assert [question.id for question in questions] == list(range(1, 31))
+    assert all(len(question.options) == 4 for question in questions)
+    whole = AdvancedQuizExtractor().extract_quiz_questions(full_text)
+    assert questions == whole
+
+
+def test_extract_one_drops_unfinished_heading(tmp_path):
+    """A numbered heading in prose is not held on to for the whole document."""
+    path = tmp_path / "prose.pdf"
+    prose = [f"Plain prose line {i} about the subject in general" for i in range(60)]
+    write_text_pdf(path, [["1. Introduction", *prose]] + [prose] * 3 + [quiz_lines(2)])
+
+    _, _, questions = _extract_one(str(path), 100)
+
+    assert [question.text for question in questions] == [
+        "Which statement about topic 1 is correct?",
+        "Which statement about topic 2 is correct?",
+    ]
+
+
+def test_extract_complete_questions_carry():
+    """Only a question that may still gain options is held back."""
+    extractor = AdvancedQuizExtractor()
+
+    text = "1. Which is right?\nA. One\nB. Two\n"
+    assert extractor.extract_complete_questions(text) == ([], 0)
+
+    text = "1. Which is right?\nA. One\nB. Two\nC. Three\nD. Four\n"
+    questions, carry_start = extractor.extract_complete_questions(text)
+    assert len(questions) == 1
+    assert carry_start == len(text)
+
+    text = "1. Introduction\n" + "Plain prose about the subject.\n" * 200
+    assert extractor.extract_complete_questions(text) == ([], len(text))
+
+
+def test_process_all_pdfs_question_count(tmp_path):
+    """The number of questions found in a directory of PDFs is stable."""
+    write_text_pdf(tmp_path / "quiz.pdf", split_pages(quiz_lines(30), 7))
+
+    questions = AdvancedQuizExtractor().process_all_pdfs(str(tmp_path))
+
+    assert len(questions) == 30
+
+
+@pytest.mark.slow()
+def test_extract_one_ignores_footer_letters():
+    """Stray letters in footers and references are not taken as options.
+
+    The line-based matching this replaced reported 34 questions here.
+    """
+    _, _, questions = _extract_one(str(RESOURCE_ROOT / "issue-604.pdf"), 100)
+
+    assert len(questions) == 2
+
+
+def write_quiz_with_key_at_end(path):
+    """30 questions over 6 pages, then an answer key alone on the last page."""
+    key = ", ".join(f"{number}. {'ABCD'[number % 4]}" for number in range(1, 31))
+    write_text_pdf(path, [*split_pages(quiz_lines(30), 6), ["Answer Key", key]])
+    return {number: "ABCD"[number % 4] for number in range(1, 31)}
+
+
+def test_extract_one_finds_answer_key_after_early_stop(tmp_path):
+    """The key on the last page is applied though reading stopped early."""
+    path = tmp_path / "quiz.pdf"
+    expected = write_quiz_with_key_at_end(path)
+
+    _, full_text, questions = _extract_one(str(path), 5)
+
+    assert "Answer Key" not in full_text
+    assert questions
+    assert {question.id: question.correct for question in questions} == {
+        question.id: expected[question.id] for question in questions
+    }
+
+
+def test_process_one_pdf_finds_answer_key_past_text_cap(tmp_path, monkeypatch):
+    """The server's text cap doesn't hide an answer key on the last page."""
+    exam_server = pytest.importorskip("exam_server")
+    path = tmp_path / "quiz.pdf"
+    expected = write_quiz_with_key_at_end(path)
+    monkeypatch.setattr(exam_server, "_MAX_TEXT_CHARS", 1000)
+
+    questions = exam_server._process_one_pdf(str(path))
+
+    structured = [question for question in questions if question["id"] in expected]
+    assert structured
+    assert all(question["correct"] == expected[question["id"]] for question in structured)